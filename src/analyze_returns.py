@@ -1,3 +1,5 @@
+from typing import Tuple
+
 import numpy as np
 import pandas as pd
 
@@ -15,74 +17,83 @@ from stats.common import (
 from stats.deflated import (
     deflated_sharpe_ratio,
     estimated_expected_maximum_sharpe_ratio,
+    estimated_sharpe_ratio_stddev,
     probabilistic_sharpe_ratio,
 )
 from stats.haircut import hlz_p_value
 
 
-def calculate_base_stats(returns: pd.Series):
-    sr = estimated_sharpe_ratio(returns)
-    sr_p_value = sharpe_ratio_p_value(sr, returns.size)
+def calculate_base_stats(returns: pd.DataFrame) -> Tuple[pd.DataFrame, np.ndarray]:
+    returns_matrix = returns.to_numpy(dtype=np.float64)
+
+    sr = estimated_sharpe_ratio(returns_matrix)
+    sr_p_value = sharpe_ratio_p_value(sr, returns_matrix.shape[1])
 
-    ann_sr = annualized_estimated_sharpe_ratio(returns, 52)  # weeks in a year
-    psr = probabilistic_sharpe_ratio(returns, sr, sr_benchmark=np.float64(0))
+    # weeks in a year
+    ann_sr = annualized_estimated_sharpe_ratio(returns_matrix, 52)
+
+    # computed once, as it is shared by PSR and DSR
+    sr_stddev = estimated_sharpe_ratio_stddev(returns_matrix, sr)
+    psr = probabilistic_sharpe_ratio(
+        returns_matrix, sr, sr_benchmark=np.float64(0), sr_stddev=sr_stddev
+    )
 
-    return pd.Series(
+    statistics = pd.DataFrame(
         {
             "SR": sr,
             "SR_p_value": sr_p_value,
             "Ann_SR": ann_sr,
             "PSR": psr,
-        }
+        },
+        index=returns.index,
     )
 
+    return statistics, sr_stddev
+
 
 if __name__ == "__main__":
     # region base
-    all_strategies_info = pd.read_csv(returns_file, index_col=0, header=[0, 1])
+    with np.load(returns_file) as all_strategies_info:
+        all_strategies_returns = pd.DataFrame(
+            all_strategies_info["returns"].astype(np.float64),
+            index=all_strategies_info["strategies"],
+            columns=all_strategies_info["dates"],
+        )
 
-    all_strategies_returns = all_strategies_info["Returns"]
+        strategy_classes = all_strategies_info["strategy_classes"]
 
-    statistics = all_strategies_returns.apply(calculate_base_stats, axis=1)
+    statistics, sr_stddev = calculate_base_stats(all_strategies_returns)
 
-    statistics["Strategy_class"] = all_strategies_info[("Meta", "Strategy_class")]
+    statistics["Strategy_class"] = strategy_classes
     # endregion
 
+    returns_corr = equal_weighted_avg_corr(all_strategies_returns)
+
     # region DSR
 
     expected_max_sr = estimated_expected_maximum_sharpe_ratio(
-        all_strategies_info["Returns"], statistics["SR"]
+        all_strategies_returns, statistics["SR"], returns_corr
     )
 
-    statistics["DSR"] = [
-        deflated_sharpe_ratio(
-            returns,
-            statistics.loc[idx, "SR"],
-            expected_max_sr,
-        )
-        for (
-            idx,
-            returns,
-        ) in all_strategies_returns.iterrows()
-    ]
+    statistics["DSR"] = deflated_sharpe_ratio(
+        all_strategies_returns.to_numpy(dtype=np.float64),
+        statistics["SR"].to_numpy(),
+        expected_max_sr,
+        sr_stddev,
+    )
     # endregion
 
     # region HSR
-    returns_corr = equal_weighted_avg_corr(all_strategies_returns)
-
     num_trials, returns_len = all_strategies_returns.shape
 
-    statistics["HLZ_p_value"] = [
-        hlz_p_value(
-            ann_sr,
-            52,
-            returns_len,
-            returns_corr,
-            num_trials,
-            hlz_num_simulations,
-        )
-        for ann_sr in statistics["Ann_SR"]
-    ]
+    statistics["HLZ_p_value"] = hlz_p_value(
+        statistics["Ann_SR"].to_numpy(),
+        52,
+        returns_len,
+        returns_corr,
+        num_trials,
+        hlz_num_simulations,
+    )
     # endregion
 
     statistics.to_csv(raw_results_file)
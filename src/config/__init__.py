@@ -1,6 +1,8 @@
 import os
+from functools import lru_cache
 from itertools import product
 from pathlib import Path
+from typing import Any, Dict, List, Type
 
 import backtrader as bt
 
@@ -38,7 +40,7 @@ project_root = Path(os.path.abspath(__file__)).parent.parent.parent
 data_dir = project_root / "data"
 
 calculations_dir = project_root / "results"
-returns_file = calculations_dir / "returns.csv"
+returns_file = calculations_dir / "returns.npz"
 raw_results_file = calculations_dir / "raw_results.csv"
 all_table_file = calculations_dir / "all.tex"
 top_10_table_file = calculations_dir / "top_10.tex"
@@ -65,123 +67,148 @@ def get_ticker_dataname(ticker: str) -> Path:
 
 # region strategies
 
-
-oscillatior_backtest_configs = [
-    BacktestConfig(
-        strategy=OscillatorValueStrategy,
-        strategy_class=StrategyClass.OSCILLATORS,
-        ticker=ticker,
-        params={
-            "ind": indicator,
-            "p": period,
-            "os": oversold,
-            "ob": overbought,
-        },
-    )
-    for (
-        ticker,
-        (indicator, oversold, overbought),
-        period,
-    ) in product(
-        tickers,
-        [
-            (bt.indicators.RSI, 30, 70),
-            (bt.indicators.StochasticFast, 80, 20),
-            (MFI, 80, 20),
-        ],
-        [14, 21],
-    )
-    # FX has no volume info, so MFI wouldn't work there
-    if (ticker not in fx_tickers if indicator == MFI else True)
-]
-
-ma_price_crossover_backtest_configs = [
-    BacktestConfig(
-        strategy=MAPriceCrossoverStrategy,
-        strategy_class=StrategyClass.MOVING_AVERAGES,
-        ticker=ticker,
-        params={
-            "ma_ind": ma_indicator,
-            "p": period,
-        },
-    )
-    for (ticker, ma_indicator, period) in product(
-        tickers,
-        [bt.indicators.SMA, bt.indicators.EMA],
-        [5, 10, 15],
-    )
-]
-
-two_ma_crossover_backtest_configs = [
-    BacktestConfig(
-        strategy=TwoMACrossoverStrategy,
-        strategy_class=StrategyClass.MOVING_AVERAGES,
-        ticker=ticker,
-        params={
-            "ma_ind": ma_indicator,
-            "f_p": fast_period,
-            "s_p": slow_period,
-        },
-    )
-    for (
-        ticker,
-        ma_indicator,
-        (fast_period, slow_period),
-    ) in product(
-        tickers,
-        [bt.indicators.SMA, bt.indicators.EMA],
-        [(5, 20), (10, 30)],
-    )
-]
-
-bb_trend_following_backtest_configs = [
-    BacktestConfig(
-        strategy=BBTrendFollowingStrategy,
-        strategy_class=StrategyClass.BOLLINGER_BANDS,
-        ticker=ticker,
-        params={
-            "p": period,
-            "df": devfactor,
-            "ind": indicator,
-        },
-    )
-    for (
-        (ticker, indicator),
-        (period, devfactor),
-    ) in product(
-        [
-            # Use RSI only on FX, as that has no volume info
-            *product(fx_tickers, [bt.indicators.RSI]),
-            # Use MFI only on crypto
-            *product(crypto_tickers, [MFI]),
-        ],
-        [(20, 2.0), (10, 1.9), (50, 2.1)],
+# indicators are referenced by name in the configs,
+# keeping them small to send to the workers, and serializable
+indicators: Dict[str, Type[bt.Indicator]] = {
+    "RSI": bt.indicators.RSI,
+    "StochasticFast": bt.indicators.StochasticFast,
+    "MFI": MFI,
+    "SMA": bt.indicators.SMA,
+    "EMA": bt.indicators.EMA,
+}
+
+# params of the strategies holding the indicator names
+indicator_params = ("ind", "ma_ind")
+
+
+@lru_cache(maxsize=None)
+def _build_backtest_configs() -> List[BacktestConfig]:
+    oscillatior_backtest_configs = [
+        BacktestConfig(
+            strategy=OscillatorValueStrategy,
+            strategy_class=StrategyClass.OSCILLATORS,
+            ticker=ticker,
+            params={
+                "ind": indicator,
+                "p": period,
+                "os": oversold,
+                "ob": overbought,
+            },
+        )
+        for (
+            ticker,
+            (indicator, oversold, overbought),
+            period,
+        ) in product(
+            tickers,
+            [
+                ("RSI", 30, 70),
+                ("StochasticFast", 80, 20),
+                ("MFI", 80, 20),
+            ],
+            [14, 21],
+        )
+        # FX has no volume info, so MFI wouldn't work there
+        if (ticker not in fx_tickers if indicator == "MFI" else True)
+    ]
+
+    ma_price_crossover_backtest_configs = [
+        BacktestConfig(
+            strategy=MAPriceCrossoverStrategy,
+            strategy_class=StrategyClass.MOVING_AVERAGES,
+            ticker=ticker,
+            params={
+                "ma_ind": ma_indicator,
+                "p": period,
+            },
+        )
+        for (ticker, ma_indicator, period) in product(
+            tickers,
+            ["SMA", "EMA"],
+            [5, 10, 15],
+        )
+    ]
+
+    two_ma_crossover_backtest_configs = [
+        BacktestConfig(
+            strategy=TwoMACrossoverStrategy,
+            strategy_class=StrategyClass.MOVING_AVERAGES,
+            ticker=ticker,
+            params={
+                "ma_ind": ma_indicator,
+                "f_p": fast_period,
+                "s_p": slow_period,
+            },
+        )
+        for (
+            ticker,
+            ma_indicator,
+            (fast_period, slow_period),
+        ) in product(
+            tickers,
+            ["SMA", "EMA"],
+            [(5, 20), (10, 30)],
+        )
+    ]
+
+    bb_trend_following_backtest_configs = [
+        BacktestConfig(
+            strategy=BBTrendFollowingStrategy,
+            strategy_class=StrategyClass.BOLLINGER_BANDS,
+            ticker=ticker,
+            params={
+                "p": period,
+                "df": devfactor,
+                "ind": indicator,
+            },
+        )
+        for (
+            (ticker, indicator),
+            (period, devfactor),
+        ) in product(
+            [
+                # Use RSI only on FX, as that has no volume info
+                *product(fx_tickers, ["RSI"]),
+                # Use MFI only on crypto
+                *product(crypto_tickers, ["MFI"]),
+            ],
+            [(20, 2.0), (10, 1.9), (50, 2.1)],
+        )
+    ]
+
+    bb_volatility_backtest_configs = [
+        BacktestConfig(
+            strategy=BBVolatilityBreakoutStrategy,
+            strategy_class=StrategyClass.BOLLINGER_BANDS,
+            ticker=crypto_tickers[0],
+            params={
+                "p": period,
+                "df": devfactor,
+                "lb_p": lookback_period,
+            },
+        )
+        for ((period, devfactor), lookback_period) in product(
+            [(20, 2.0), (10, 1.9), (50, 2.1)], [180, 120]
+        )
+    ]
+
+    return (
+        oscillatior_backtest_configs
+        + ma_price_crossover_backtest_configs
+        + two_ma_crossover_backtest_configs
+        + bb_trend_following_backtest_configs
+        + bb_volatility_backtest_configs
     )
-]
-
-bb_volatility_backtest_configs = [
-    BacktestConfig(
-        strategy=BBVolatilityBreakoutStrategy,
-        strategy_class=StrategyClass.BOLLINGER_BANDS,
-        ticker=crypto_tickers[0],
-        params={
-            "p": period,
-            "df": devfactor,
-            "lb_p": lookback_period,
-        },
-    )
-    for ((period, devfactor), lookback_period) in product(
-        [(20, 2.0), (10, 1.9), (50, 2.1)], [180, 120]
-    )
-]
-
-backtest_configs = (
-    oscillatior_backtest_configs
-    + ma_price_crossover_backtest_configs
-    + two_ma_crossover_backtest_configs
-    + bb_trend_following_backtest_configs
-    + bb_volatility_backtest_configs
-)
+
+
+def __getattr__(name: str) -> Any:
+    # expand the configs only when they are actually used,
+    # e.g. not when the analysis scripts import the paths
+    if name == "backtest_configs":
+        return _build_backtest_configs()
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # endregion
 
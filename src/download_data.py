@@ -7,14 +7,21 @@ from utils.output import ensure_empty_dir
 if __name__ == "__main__":
     ensure_empty_dir(cfg.data_dir)
 
-    for ticker in cfg.tickers:
-        data: pd.DataFrame = yf.download(
-            ticker,
-            start=cfg.start_date,
-            end=cfg.end_date,
-            interval=cfg.interval,
-        )
+    # a single call downloads all of the tickers concurrently
+    data: pd.DataFrame = yf.download(
+        cfg.tickers,
+        start=cfg.start_date,
+        end=cfg.end_date,
+        interval=cfg.interval,
+        group_by="ticker",
+        threads=True,
+        auto_adjust=False,
+        ignore_tz=True,
+    )
 
+    for ticker in cfg.tickers:
         print(f"Downloaded {ticker} from {cfg.start_date} to {cfg.end_date}")
 
-        data.to_csv(cfg.get_ticker_dataname(ticker))
+        # the tickers share a single index, so drop the days
+        # that the ticker was not traded on, e.g. weekends for FX
+        data[ticker].dropna(how="all").to_csv(cfg.get_ticker_dataname(ticker))
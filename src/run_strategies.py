@@ -1,7 +1,9 @@
 import multiprocessing
+from typing import Any, Dict
 
 import backtrader as bt
 import backtrader.feeds as btfeeds
+import numpy as np
 import pandas as pd
 
 from config import (
@@ -10,9 +12,32 @@ from config import (
     broker_cash,
     calculations_dir,
     get_ticker_dataname,
+    indicator_params,
+    indicators,
     returns_file,
+    tickers,
 )
-from utils.output import ensure_empty_dir, get_strategy_name
+from utils.output import ensure_empty_dir
+
+# OHLC data of every ticker, parsed once in the parent process
+# and handed to the workers by `init_worker`
+ticker_data: Dict[str, pd.DataFrame] = {}
+
+
+def load_ticker_data(ticker: str) -> pd.DataFrame:
+    df = pd.read_csv(
+        get_ticker_dataname(ticker),
+        parse_dates=["Date"],
+        index_col="Date",
+    )
+
+    # column order expected by `PandasDirectData`
+    return df[["Open", "High", "Low", "Close", "Volume"]]
+
+
+def init_worker(data_by_ticker: Dict[str, pd.DataFrame]):
+    global ticker_data
+    ticker_data = data_by_ticker
 
 
 def setup_broker(cerebro: bt.Cerebro):
@@ -23,16 +48,23 @@ def setup_sizer(cerebro: bt.Cerebro):
     cerebro.addsizer(bt.sizers.PercentSizer, percents=5)
 
 
-def add_ticker_data(cerebro: bt.Cerebro, ticker: str):
-    data = btfeeds.YahooFinanceCSVData(
-        dataname=get_ticker_dataname(ticker),
-        # rounding at least causes EURUSD to break the fast stoch
-        round=False,
-    )
+def add_ticker_data(cerebro: bt.Cerebro, ticker: str, df: pd.DataFrame):
+    # iterates `df.itertuples()`, which is much faster
+    # than the per-bar lookups of `PandasData`;
+    # prices are not rounded, as rounding
+    # at least causes EURUSD to break the fast stoch
+    data = btfeeds.PandasDirectData(dataname=df, name=ticker, openinterest=-1)
 
     cerebro.adddata(data)
 
 
+def resolve_indicators(params: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        key: indicators[value] if key in indicator_params else value
+        for key, value in params.items()
+    }
+
+
 def add_analyzers(cerebro: bt.Cerebro):
     cerebro.addanalyzer(
         bt.analyzers.TimeReturn,
@@ -52,10 +84,16 @@ def run_strategy(cerebro: bt.Cerebro):
 
     returns = results[0].analyzers.returns.get_analysis()
 
-    strategy = cerebro.runstrats[0][0]
-    row_name = f"{get_strategy_name(strategy)}"
+    # the name is computed once, when the strategy is created
+    row_name = results[0].name
+
+    # plain values are cheaper to send back to the parent process
+    # than a dataframe, and are read straight from the analysis
+    # without intermediate lists
+    values = np.fromiter(returns.values(), dtype=np.float64, count=len(returns))
+    dates = tuple(returns.keys())
 
-    return pd.DataFrame({row_name: returns}).transpose()
+    return row_name, values, dates
 
 
 def run_backtest(cfg: BacktestConfig):
@@ -64,30 +102,48 @@ def run_backtest(cfg: BacktestConfig):
     setup_broker(cerebro)
     setup_sizer(cerebro)
 
-    add_ticker_data(cerebro, cfg.ticker)
+    add_ticker_data(cerebro, cfg.ticker, ticker_data[cfg.ticker])
 
-    cerebro.addstrategy(cfg.strategy, **cfg.params)
+    cerebro.addstrategy(cfg.strategy, **resolve_indicators(cfg.params))
 
     add_analyzers(cerebro)
 
-    df = run_strategy(cerebro)
-
-    # Group all returns into a "Returns" column group
-    df.columns = pd.MultiIndex.from_product([["Returns"], df.columns])
-
-    df[("Meta", "Strategy_class")] = cfg.strategy_class.value
+    row_name, returns, dates = run_strategy(cerebro)
 
-    return df
+    return row_name, returns, dates, cfg.strategy_class.value
 
 
 if __name__ == "__main__":
     num_processes = multiprocessing.cpu_count()
-    pool = multiprocessing.Pool(num_processes)
 
-    df_returns_list = pool.map(run_backtest, backtest_configs)
+    data_by_ticker = {ticker: load_ticker_data(ticker) for ticker in tickers}
 
-    # create a single dataframe for the returns of all strategies
-    df_all_returns = pd.concat(df_returns_list)
+    # backtests differ in runtime, so hand them out one at a time
+    # to balance the load, and recycle the workers
+    # to cap backtrader's memory growth
+    with multiprocessing.Pool(
+        num_processes,
+        initializer=init_worker,
+        initargs=(data_by_ticker,),
+        maxtasksperchild=4,
+    ) as pool:
+        results = list(pool.imap(run_backtest, backtest_configs, chunksize=1))
+
+    row_names, returns_list, dates_list, strategy_classes = zip(*results)
+
+    # weekly sampling aligns the returns of all strategies
+    dates = dates_list[0]
+    if any(strategy_dates != dates for strategy_dates in dates_list):
+        raise ValueError("Returns of all strategies should share the same dates")
 
     ensure_empty_dir(calculations_dir)
-    df_all_returns.to_csv(returns_file)
+
+    # store the returns of all strategies as a single float32 matrix,
+    # which is plenty for weekly returns, alongside the row metadata
+    np.savez(
+        returns_file,
+        returns=np.vstack(returns_list).astype(np.float32),
+        strategies=np.array(row_names),
+        dates=np.array(dates, dtype="datetime64[s]"),
+        strategy_classes=np.array(strategy_classes),
+    )
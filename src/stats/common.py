@@ -6,10 +6,10 @@ import scipy.stats as stats
 
 
 def estimated_sharpe_ratio(
-    returns: pd.Series,
-) -> np.float64:
+    returns: np.ndarray,
+) -> np.ndarray:
     """
-    Calculate the estimated Sharpe ratio, assuming 0 as
+    Calculate the estimated Sharpe ratios, assuming 0 as
     the risk-free rate
 
     .. math::
@@ -18,42 +18,76 @@ def estimated_sharpe_ratio(
 
     Parameters
     ----------
-    returns : pd.Series
-        A series of returns of the strategy, in the
+    returns : np.ndarray
+        A 2D array, where each row is
+        a series of returns of the strategy, in the
         original sampling frequency
 
     Returns
     -------
-    np.float64
-    The estimated Sharpe ratio,
+    np.ndarray
+    The estimated Sharpe ratios,
     calculated as the mean divided by the standard deviation
     """
-    mean = returns.mean()
-    std = returns.std(ddof=1)
+    mean = returns.mean(axis=-1)
+    std = returns.std(axis=-1, ddof=1)
 
-    # all-zeroes series
-    if mean == 0 and std == 0:
-        return np.float64(0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sr = mean / std
 
-    sr = mean / std
+    # all-zeroes series
+    sr = np.where((mean == 0) & (std == 0), 0, sr)
 
     return sr
 
 
-def annualized_estimated_sharpe_ratio(returns: pd.Series, periods: int) -> np.float64:
+def lag_1_autocorr(returns: np.ndarray) -> np.ndarray:
+    """
+    Calculate the lag-1 autocorrelation of returns,
+    i.e. the Pearson correlation between the series
+    and the series shifted by one period
+
+    Parameters
+    ----------
+    returns : np.ndarray
+        A 2D array, where each row is
+        a series of returns of the strategy
+
+    Returns
+    -------
+    np.ndarray
+    The lag-1 autocorrelations
+    """
+    current = returns[..., 1:]
+    previous = returns[..., :-1]
+
+    current = current - current.mean(axis=-1, keepdims=True)
+    previous = previous - previous.mean(axis=-1, keepdims=True)
+
+    # NaN for constant series
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rho = (current * previous).sum(axis=-1) / np.sqrt(
+            (current**2).sum(axis=-1) * (previous**2).sum(axis=-1)
+        )
+
+    return rho
+
+
+def annualized_estimated_sharpe_ratio(returns: np.ndarray, periods: int) -> np.ndarray:
     """
     Calculate the annualized version of the
-    estimated Sharpe ratio,
+    estimated Sharpe ratios,
     assuming 0 as the risk-free rate.
 
-    The Sharpe ratio will be adjusted for autocorrelation,
+    The Sharpe ratios will be adjusted for autocorrelation,
     following the method outlined in
     "The Statistics of Sharpe Ratios" (Lo, 2002)
 
     Parameters
     ----------
-    returns : pd.Series
-        A series of returns of the strategy,
+    returns : np.ndarray
+        A 2D array, where each row is
+        a series of returns of the strategy,
         in the original sampling frequency
     periods : int
         Frequency of the returns,
@@ -61,26 +95,36 @@ def annualized_estimated_sharpe_ratio(returns: pd.Series, periods: int) -> np.fl
 
     Returns
     -------
-    np.float64
-    The annualized estimated Sharpe ratio
+    np.ndarray
+    The annualized estimated Sharpe ratios
     """
     sharpe_ratio = estimated_sharpe_ratio(returns)
 
-    # might be an all-zeroes returns series,
-    # which would produce NaN autocorr
-    if sharpe_ratio == 0:
-        return np.float64(0)
-
     annual_multiplier = np.sqrt(periods)
 
-    rho = returns.autocorr(lag=1)
+    rho = lag_1_autocorr(returns)
 
-    # part of scale factor in equation 22
-    autocorr_multiplier = (
-        1 + (2 * rho / (1 - rho)) * (1 - ((1 - rho**periods) / (periods * (1 - rho))))
-    ) ** (-0.5)
+    rho_pow = np.power(rho, periods)
+    one_minus_rho = 1 - rho
 
-    return annual_multiplier * autocorr_multiplier * sharpe_ratio
+    # part of scale factor in equation 22,
+    # which tends to 1 / sqrt(periods) as rho tends to 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        autocorr_multiplier = (
+            1
+            + (2 * rho / one_minus_rho)
+            * (1 - (1 - rho_pow) / (periods * one_minus_rho))
+        ) ** (-0.5)
+
+    autocorr_multiplier = np.where(rho == 1, 1 / annual_multiplier, autocorr_multiplier)
+
+    # might be an all-zeroes returns series,
+    # which would produce NaN autocorr
+    return np.where(
+        sharpe_ratio == 0,
+        0,
+        annual_multiplier * autocorr_multiplier * sharpe_ratio,
+    )
 
 
 # endregion
@@ -90,16 +134,16 @@ def annualized_estimated_sharpe_ratio(returns: pd.Series, periods: int) -> np.fl
 
 
 def sharpe_ratio_t_statistic(
-    sharpe_ratio: np.float64, num_observations: int
-) -> np.float64:
+    sharpe_ratio: np.ndarray, num_observations: int
+) -> np.ndarray:
     """
-    Calculate the t-statistic, as a result of
-    transforming a Sharpe ratio
+    Calculate the t-statistics, as a result of
+    transforming Sharpe ratios
 
     Parameters
     ----------
-    sharpe_ratio: np.float64
-        The Sharpe ratio
+    sharpe_ratio: np.ndarray
+        The Sharpe ratios
     num_observations: int
         The number of observations present in
         the returns series,
@@ -107,27 +151,27 @@ def sharpe_ratio_t_statistic(
 
     Returns
     -------
-    np.float64
-    The t-statistic of the Sharpe ratio
+    np.ndarray
+    The t-statistics of the Sharpe ratios
     """
     t_statistic = sharpe_ratio * np.sqrt(num_observations)
 
     return t_statistic
 
 
-def sharpe_ratio_p_value(sharpe_ratio: np.float64, num_observations: int) -> np.float64:
+def sharpe_ratio_p_value(sharpe_ratio: np.ndarray, num_observations: int) -> np.ndarray:
     """
-    Calculate the one-tailed p-value of a Sharpe ratio
+    Calculate the one-tailed p-values of Sharpe ratios
 
-    First, we obtain the t-statistic of the Sharpe ratio
+    First, we obtain the t-statistics of the Sharpe ratios
 
-    Second, the one-tailed p-value is calculated,
-    quantifying the statistical significance of the SR
+    Second, the one-tailed p-values are calculated,
+    quantifying the statistical significance of the SRs
 
     Parameters
     ----------
-    sharpe_ratio: np.float64
-        The Sharpe ratio
+    sharpe_ratio: np.ndarray
+        The Sharpe ratios
     num_observations: int
         The number of observations present in
         the returns series,
@@ -135,13 +179,13 @@ def sharpe_ratio_p_value(sharpe_ratio: np.float64, num_observations: int) -> np.
 
     Returns
     -------
-    np.float64
-    The p-value of the Sharpe ratio
+    np.ndarray
+    The p-values of the Sharpe ratios
     """
     t_statistic = sharpe_ratio_t_statistic(sharpe_ratio, num_observations)
 
     degrees_of_freedom = num_observations - 1
-    p_value = 1 - stats.t.cdf(t_statistic, df=degrees_of_freedom)
+    p_value = stats.t.sf(t_statistic, df=degrees_of_freedom)
 
     return p_value
 
@@ -180,26 +224,35 @@ def equal_weighted_avg_corr(
     np.float64
     The equal weighted average correlation between returns
     """
-    num_strategies = returns.shape[0]
-    corr_sum = np.float64(0)
-    num_pairs = 0
-
-    for i in range(num_strategies):
-        if np.count_nonzero(returns.iloc[i]) == 0:
-            continue
-
-        for j in range(i + 1, num_strategies):
-            if np.count_nonzero(returns.iloc[j]) == 0:
-                continue
-
-            corr_sum += returns.iloc[i].corr(returns.iloc[j])
-            num_pairs += 1
-
-    # if no rows were skipped, `num_pairs` would be
-    # equal to `num_strategies * (num_strategies - 1)`
-    # thus making this formula aligned with the one
-    # presented in de Prado's work
-    average_correlation = 2 * corr_sum / num_pairs
+    returns_matrix = returns.to_numpy(dtype=np.float64, copy=False)
+
+    # skip all-zeroes rows
+    returns_matrix = returns_matrix[returns_matrix.any(axis=1)]
+
+    num_strategies, num_observations = returns_matrix.shape
+
+    # standardize each row, so that the correlation
+    # of two rows is the scaled dot product of their z-scores
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z_scores = (
+            returns_matrix - returns_matrix.mean(axis=1, keepdims=True)
+        ) / returns_matrix.std(axis=1, ddof=1, keepdims=True)
+
+    # the sum of correlations over all ordered pairs (i, j), i != j,
+    # is the squared norm of the summed z-scores without the diagonal,
+    # so the full correlation matrix is never formed
+    z_scores_sum = z_scores.sum(axis=0)
+    corr_sum = (z_scores_sum @ z_scores_sum - np.sum(z_scores**2)) / (
+        num_observations - 1
+    )
+
+    # every pair of strategies is counted twice in `corr_sum`,
+    # once for each order, so the number of ordered pairs
+    # `num_strategies * (num_strategies - 1)` makes this formula
+    # aligned with the one presented in de Prado's work
+    num_ordered_pairs = num_strategies * (num_strategies - 1)
+
+    average_correlation = corr_sum / num_ordered_pairs
 
     return average_correlation
 
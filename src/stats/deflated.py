@@ -1,3 +1,5 @@
+from typing import Optional
+
 import numpy as np
 import pandas as pd
 from scipy import stats
@@ -7,10 +9,10 @@ from .common import equal_weighted_avg_corr
 
 # region Probabilistic
 def estimated_sharpe_ratio_stddev(
-    returns: pd.Series, sharpe_ratio: np.float64
-) -> np.float64:
+    returns: np.ndarray, sharpe_ratio: np.ndarray
+) -> np.ndarray:
     """
-    Calculate the estimated Sharpe ratio standard deviation
+    Calculate the estimated Sharpe ratio standard deviations
 
     .. math::
         \\hat{\\sigma}(\\widehat{\\text{SR}}) =
@@ -29,37 +31,39 @@ def estimated_sharpe_ratio_stddev(
 
     Parameters
     ----------
-    returns : pd.Series
-        A series of returns of the strategy, in the
+    returns : np.ndarray
+        A 2D array, where each row is
+        a series of returns of the strategy, in the
         original sampling frequency
-    sharpe_ratio: np.float64
-        The non-annualized Sharpe ratio
+    sharpe_ratio: np.ndarray
+        The non-annualized Sharpe ratios
 
     Returns
     -------
-    np.float64
-    The estimated Sharpe ratio standard deviation,
+    np.ndarray
+    The estimated Sharpe ratio standard deviations,
     as derived based on the above-mentioned formula
     """
 
-    skew = stats.skew(returns)
-    kurtosis = stats.kurtosis(returns)
+    skew = stats.skew(returns, axis=-1)
+    kurtosis = stats.kurtosis(returns, axis=-1)
 
     sr_stddev = np.sqrt(
         (1 - skew * sharpe_ratio + (kurtosis - 1) / 4 * sharpe_ratio**2)
-        / (returns.size - 1)
+        / (returns.shape[-1] - 1)
     )
 
     return sr_stddev
 
 
 def probabilistic_sharpe_ratio(
-    returns: pd.Series,
-    sr: np.float64,
+    returns: np.ndarray,
+    sr: np.ndarray,
     sr_benchmark: np.float64,
-) -> np.float64:
+    sr_stddev: Optional[np.ndarray] = None,
+) -> np.ndarray:
     """
-    Calculate the Probabilistic Sharpe ratio (PSR)
+    Calculate the Probabilistic Sharpe ratios (PSR)
 
     PSR is a skill metric that states the probability
     of observing a future Sharpe ratio that will be above
@@ -81,29 +85,33 @@ def probabilistic_sharpe_ratio(
 
     Parameters
     ----------
-    returns : pd.Series
-        A series of returns of the strategy, in the
+    returns : np.ndarray
+        A 2D array, where each row is
+        a series of returns of the strategy, in the
         original sampling frequency
-    sr: np.float64
-        The non-annualized Sharpe ratio
+    sr: np.ndarray
+        The non-annualized Sharpe ratios
     sr_benchmark: np.float64
         The benchmark Sharpe ratio, usually set to 0
+    sr_stddev: Optional[np.ndarray]
+        Precomputed estimated Sharpe ratio standard deviations,
+        calculated if not provided
 
     Returns
     -------
-    np.float64
-    The Probabilistic Sharpe ratio, with the value
+    np.ndarray
+    The Probabilistic Sharpe ratios, with the values
     ranging from 0 to 1
     """
 
-    sr_stddev = estimated_sharpe_ratio_stddev(returns, sr)
-
-    # all-zeroes series
-    if np.isnan(sr_stddev):
-        return np.float64(0)
+    if sr_stddev is None:
+        sr_stddev = estimated_sharpe_ratio_stddev(returns, sr)
 
     psr = stats.norm.cdf((sr - sr_benchmark) / sr_stddev)
 
+    # all-zeroes series
+    psr = np.where(np.isnan(sr_stddev), 0, psr)
+
     return psr
 
 
@@ -115,6 +123,7 @@ def probabilistic_sharpe_ratio(
 
 def est_num_of_independent_trials(
     returns: pd.DataFrame,
+    corr: Optional[np.float64] = None,
 ) -> int:
     """
     Calculate the estimated number of independent trials
@@ -124,6 +133,9 @@ def est_num_of_independent_trials(
     returns : pd.DataFrame
         A dataframe, where each row is
         a series of non-annualized returns of the strategy
+    corr : Optional[np.float64]
+        Precomputed equal weighted average correlation
+        between the returns, calculated if not provided
 
     Returns
     -------
@@ -134,7 +146,9 @@ def est_num_of_independent_trials(
     """
 
     num_strategies = returns.shape[0]
-    corr = equal_weighted_avg_corr(returns)
+
+    if corr is None:
+        corr = equal_weighted_avg_corr(returns)
 
     # Ceil up to get an at least slightly lower DSR,
     # minimally compensating for the overfit correlation
@@ -142,7 +156,9 @@ def est_num_of_independent_trials(
 
 
 def estimated_expected_maximum_sharpe_ratio(
-    returns: pd.DataFrame, sharpe_ratios: pd.Series
+    returns: pd.DataFrame,
+    sharpe_ratios: pd.Series,
+    corr: Optional[np.float64] = None,
 ) -> np.float64:
     """
     Calculate the estimated expected maximum sharpe ratio
@@ -155,6 +171,9 @@ def estimated_expected_maximum_sharpe_ratio(
     sharpe_ratios : pd.Series
         A series of non-annualized
         sharpe ratios of the strategies
+    corr : Optional[np.float64]
+        Precomputed equal weighted average correlation
+        between the returns, calculated if not provided
 
     Returns
     -------
@@ -163,7 +182,7 @@ def estimated_expected_maximum_sharpe_ratio(
     """
 
     variance = sharpe_ratios.var()
-    num_trials = est_num_of_independent_trials(returns)
+    num_trials = est_num_of_independent_trials(returns, corr)
 
     return np.sqrt(variance) * (
         (1 - np.euler_gamma) * stats.norm.ppf(1 - (1 / num_trials))
@@ -172,12 +191,13 @@ def estimated_expected_maximum_sharpe_ratio(
 
 
 def deflated_sharpe_ratio(
-    returns: pd.Series,
-    sr: np.float64,
+    returns: np.ndarray,
+    sr: np.ndarray,
     expected_max_sr: np.float64,
-) -> np.float64:
+    sr_stddev: Optional[np.ndarray] = None,
+) -> np.ndarray:
     """
-    Calculate the Deflated Sharpe ratio (DSR)
+    Calculate the Deflated Sharpe ratios (DSR)
 
     DSR is PSR with
     the benchmark Sharpe ratio calculated in a way
@@ -210,22 +230,28 @@ def deflated_sharpe_ratio(
 
     Parameters
     ----------
-    returns : pd.Series
-        A series of returns of the strategy, in the
+    returns : np.ndarray
+        A 2D array, where each row is
+        a series of returns of the strategy, in the
         original sampling frequency
-    sr: np.float64
-        The non-annualized Sharpe ratio
+    sr: np.ndarray
+        The non-annualized Sharpe ratios
     expected_max_sr: np.float64
         The estimated expected maximum sharpe ratio
+    sr_stddev: Optional[np.ndarray]
+        Precomputed estimated Sharpe ratio standard deviations,
+        calculated if not provided
 
     Returns
     -------
-    np.float64
-    The Deflated Sharpe ratio, with the value
+    np.ndarray
+    The Deflated Sharpe ratios, with the values
     ranging from 0 to 1
     """
 
-    return probabilistic_sharpe_ratio(returns, sr, sr_benchmark=expected_max_sr)
+    return probabilistic_sharpe_ratio(
+        returns, sr, sr_benchmark=expected_max_sr, sr_stddev=sr_stddev
+    )
 
 
 # endregion
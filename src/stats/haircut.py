@@ -1,51 +1,92 @@
 from dataclasses import dataclass
 
 import numpy as np
-import pandas as pd
-from scipy import linalg, stats
+from numba import njit, prange
+from scipy import special
 
 from .common import sharpe_ratio_p_value
 
+rng = np.random.default_rng()
+
 # region p-value adjustments
 
 
-def bhy_adjustment(p_values_asc: np.ndarray) -> np.ndarray:
+def bhy_multipliers(num_tests: int) -> np.ndarray:
+    """
+    Get the multipliers of the
+    Benjamini-Hochberg-Yekutieli (BHY) adjustment,
+    which only depend on the number of tests
+
+    Parameters
+    ----------
+    num_tests: int
+        The number of tests (p-values) being adjusted
+
+    Returns
+    -------
+    np.ndarray
+    The multipliers for each position
+    of the p-values sorted in ascending order
+    """
+
+    ranks = np.arange(1, num_tests + 1)
+
+    normalizing_constant = np.sum(1 / ranks)
+
+    return (num_tests * normalizing_constant) / ranks
+
+
+@njit(cache=True, fastmath=True)
+def bhy_adjustment_with_insertion(
+    p_values_asc: np.ndarray, multipliers: np.ndarray
+) -> np.ndarray:
     """
     Applies the Benjamini-Hochberg-Yekutieli (BHY)
-    multiple testing adjustment to a series of p-values
+    multiple testing adjustment to a series of p-values,
+    accounting for one more p-value that will be inserted
+    into the series before one of its elements
+
+    Whatever is inserted before the element at position i,
+    the elements from i onwards are shifted by one position,
+    and the adjusted p-values of those elements stay the same.
+    Thus, the adjustment is computed once per series,
+    instead of once per inserted p-value
 
     Parameters
     ----------
     p_values_asc: np.ndarray
         A series of p-values, sorted in ascending order
+    multipliers: np.ndarray
+        The BHY multipliers for the series
+        with the inserted p-value
 
     Returns
     -------
     np.ndarray
-    The adjusted p-values
+    The adjusted p-values of the series,
+    after the insertion of one more p-value
     """
 
     n = p_values_asc.size
 
-    normalizing_constant = np.sum(1 / np.arange(1, n + 1))
-    adjusted_p_values = np.zeros(n)
-
-    # iterate backwards from (n - 1) to 0
-    for i in np.arange(n - 1, -1, -1):
-        # for the last element,
-        # the value is simply the p-value
-        if i == n - 1:
-            adjusted_p_values[i] = p_values_asc[i]
-        # for other elements, the value is
-        # the min of the adjusted one,
-        # or the next element
-        else:
-            multiplier = (n * normalizing_constant) / (i + 1)
-
-            adjusted_p_values[i] = min(
-                adjusted_p_values[i + 1],
-                p_values_asc[i] * multiplier,
-            )
+    adjusted_p_values = np.empty(n)
+
+    # for the last element,
+    # the value is simply the p-value
+    adjusted_p_value = p_values_asc[n - 1]
+    adjusted_p_values[n - 1] = adjusted_p_value
+
+    # iterate backwards from (n - 2) to 0,
+    # the value being the min of the adjusted one,
+    # or the next element, with every element
+    # shifted by one position due to the insertion
+    for i in range(n - 2, -1, -1):
+        candidate = p_values_asc[i] * multipliers[i + 1]
+
+        if candidate < adjusted_p_value:
+            adjusted_p_value = candidate
+
+        adjusted_p_values[i] = adjusted_p_value
 
     return adjusted_p_values
 
@@ -91,69 +132,40 @@ def get_simulation_parameters(
     if returns_corr < 0 or returns_corr > 1:
         raise ValueError("Returns correlation should be between 0 and 1")
 
-    parameters_df = pd.DataFrame(
-        {
-            "rho": [0.0, 0.2, 0.4, 0.6, 0.8],
-            "total_num_trials": [
-                1295,
-                1377,
-                1476,
-                1773,
-                3109,
-            ],
-            "prob_zero_mean": [
-                3.9660 * 0.1,
-                4.4589 * 0.1,
-                4.8604 * 0.1,
-                5.9902 * 0.1,
-                8.3901 * 0.1,
-            ],
-            "lambd": [
-                5.4995 * 0.001,
-                5.5508 * 0.001,
-                5.5413 * 0.001,
-                5.5512 * 0.001,
-                5.5956 * 0.001,
-            ],
-        }
-    ).set_index("rho", drop=False)
-
-    rho1 = 0.0
-    rho2 = 0.2
-    if returns_corr < 0.2:
-        rho1 = 0.0
-        rho2 = 0.2
-    elif returns_corr < 0.4:
-        rho1 = 0.2
-        rho2 = 0.4
-    elif returns_corr < 0.6:
-        rho1 = 0.4
-        rho2 = 0.6
-    else:
-        rho1 = 0.6
-        rho2 = 0.8
-
-    rho1_params = parameters_df.loc[rho1]
-    rho2_params = parameters_df.loc[rho2]
+    # parameters of the model for the tabulated correlations
+    rho_grid = np.array([0.0, 0.2, 0.4, 0.6, 0.8])
+    total_num_trials_grid = np.array([1295, 1377, 1476, 1773, 3109])
+    prob_zero_mean_grid = np.array([3.9660, 4.4589, 4.8604, 5.9902, 8.3901]) * 0.1
+    lambd_grid = np.array([5.4995, 5.5508, 5.5413, 5.5512, 5.5956]) * 0.001
+
+    # index of the lower bound of the
+    # correlations bracket, with the last
+    # bracket also covering correlations above 0.8
+    lower_idx = int(min(max(returns_corr * 5, 0), 3))
+
+    rho1 = rho_grid[lower_idx]
+    rho2 = rho_grid[lower_idx + 1]
 
     rho1_weight = (rho2 - returns_corr) / (rho2 - rho1)
     rho2_weight = (returns_corr - rho1) / (rho2 - rho1)
 
-    interpolated_parameters = rho1_params * rho1_weight + rho2_params * rho2_weight
+    def interpolate(grid: np.ndarray) -> np.float64:
+        return grid[lower_idx] * rho1_weight + grid[lower_idx + 1] * rho2_weight
+
+    interpolated_total_num_trials = interpolate(total_num_trials_grid)
 
     # cast to int, and ensure
     # that is greater than `num_trials`
     total_num_trials = int(
-        np.floor((num_trials / interpolated_parameters["total_num_trials"]) + 1)
-        * np.floor(interpolated_parameters["total_num_trials"] + 1)
+        np.floor((num_trials / interpolated_total_num_trials) + 1)
+        * np.floor(interpolated_total_num_trials + 1)
     )
 
     return SimulationParameters(
-        # since series are homogeneous, providing
-        # the total_num_trials is provided separately
-        # for it to actually be an int, not a float
-        **interpolated_parameters.drop("total_num_trials").to_dict(),
-        total_num_trials=total_num_trials
+        rho=interpolate(rho_grid),
+        total_num_trials=total_num_trials,
+        prob_zero_mean=interpolate(prob_zero_mean_grid),
+        lambd=interpolate(lambd_grid),
     )
 
 
@@ -173,46 +185,48 @@ def generate_t_stats_panel(
     Returns
     -------
     np.ndarray
-    A 2D array of t-ratios of shape
-    (num_simulations, params.total_num_trials)
+    A 2D array of signed t-ratios of shape
+    (num_simulations, params.total_num_trials),
+    in single precision
     """
 
     # Default parameters of the model
     monthly_volatility = 0.15 / np.sqrt(12)
     num_observations = 240
 
-    correlation_vector = np.insert(
-        params.rho * np.ones((1, params.total_num_trials - 1)),
-        0,
-        1,
-    )
-
-    correlation_matrix = linalg.toeplitz(correlation_vector)
+    panel_shape = (num_simulations, params.total_num_trials)
 
-    mean = np.zeros(params.total_num_trials)
+    # the correlation matrix is a Toeplitz one, with all of the
+    # off-diagonal entries being rho, so the shocks can be drawn
+    # from a factor shared by all trials and an idiosyncratic part,
+    # which reproduces it exactly without forming the matrix
+    common_factor = rng.standard_normal((num_simulations, 1))
 
-    covariance_matrix = correlation_matrix * (
-        monthly_volatility**2 / num_observations
-    )
-
-    # NOTE: slow, takes >1s, impl compatible with numba
-    #  would be nice
-    shock_matrix = np.random.multivariate_normal(
-        mean, covariance_matrix, num_simulations
-    )
+    # the panel is accumulated in place, starting from the
+    # idiosyncratic shocks, so that the only other full-size
+    # arrays are the `non_zero_mean` mask and `mean_vec`;
+    # single precision is plenty for the median of the
+    # adjusted p-values, and halves the memory traffic
+    t_stats_panel = rng.standard_normal(panel_shape, dtype=np.float32)
+    t_stats_panel *= np.sqrt(1 - params.rho)
+    t_stats_panel += np.sqrt(params.rho) * common_factor
 
-    prob_vec = np.random.uniform(0, 1, (num_simulations, params.total_num_trials))
+    non_zero_mean = rng.random(panel_shape, dtype=np.float32) > params.prob_zero_mean
 
-    mean_vec = np.random.exponential(
-        params.lambd,
-        (num_simulations, params.total_num_trials),
-    )
+    # the t-ratios are the sums of the shocks and the means,
+    # divided by the standard deviation of the shocks,
+    # so the shocks are drawn already standardized,
+    # and only the means have to be scaled,
+    # which is folded into a single scalar multiplier
+    inv_scale = np.sqrt(num_observations) / monthly_volatility
 
-    mu_null = np.multiply(prob_vec > params.prob_zero_mean, mean_vec)
+    mean_vec = rng.standard_exponential(panel_shape, dtype=np.float32)
+    mean_vec *= params.lambd * inv_scale
+    mean_vec *= non_zero_mean
 
-    t_stats_panel = abs(mu_null + shock_matrix) / (
-        monthly_volatility / np.sqrt(num_observations)
-    )
+    # the absolute value is only taken when converting
+    # to p-values, for the t-ratios that are actually used
+    t_stats_panel += mean_vec
 
     return t_stats_panel
 
@@ -224,21 +238,25 @@ def t_panel_to_p_panel(t_stats_panel: np.ndarray, num_trials: int) -> np.ndarray
     Parameters
     ----------
     t_stats_panel: np.ndarray
-        The panel of t-ratios
+        The panel of signed t-ratios
+    num_trials: int
+        Total number of trials (strategies tested)
 
     Returns
     -------
     np.ndarray
-    A 2D array of p-values, with the same shape
+    A 2D array of p-values, of shape
+    (num_simulations, num_trials - 1),
+    with the same precision as the t-ratios
     """
 
-    n_sim = t_stats_panel.shape[0]
+    simulated_t_ratios = t_stats_panel[:, 0 : (num_trials - 1)]
 
-    p_panel = np.zeros((n_sim, num_trials - 1))
-
-    for i in range(n_sim):
-        simulated_t_ratios = t_stats_panel[i, 0 : (num_trials - 1)]
-        p_panel[i] = 1 - stats.norm.cdf(simulated_t_ratios, 0, 1)
+    # survival function of the standard normal distribution
+    # at the absolute t-ratios, without the overhead of `stats.norm`
+    # (the divisor is cast so that the panel is not upcast)
+    sqrt_2 = np.sqrt(2, dtype=t_stats_panel.dtype)
+    p_panel = 0.5 * special.erfc(np.abs(simulated_t_ratios) / sqrt_2)
 
     return p_panel
 
@@ -248,64 +266,126 @@ def t_panel_to_p_panel(t_stats_panel: np.ndarray, num_trials: int) -> np.ndarray
 # region core
 
 
-def get_multiple_testing_adjusted_p_value(
-    p_values_panel: np.ndarray, p_value: np.float64
-):
+@njit(cache=True, parallel=True)
+def simulate_adjusted_p_values(
+    p_values_panel: np.ndarray, p_values: np.ndarray, multipliers: np.ndarray
+) -> np.ndarray:
     """
-    Get a multiple testing adjusted p-value,
-    given a strategy (single-test) p-value
+    Get the multiple testing adjusted p-values of
+    several strategies in each of the simulations
+
+    The simulations are independent,
+    so they are processed in parallel
 
     Parameters
     ----------
     p_values_panel: np.ndarray
-        The panel of p-values
-    p_value: np.float64
-        The p-value of the strategy
+        The panel of p-values,
+        with each row sorted in ascending order
+    p_values: np.ndarray
+        The p-values of the strategies
+    multipliers: np.ndarray
+        The BHY multipliers for a simulation
+        with the p-value of a strategy
 
     Returns
     -------
-    np.float64
-        The multiple testing adjusted p-value
+    np.ndarray
+        A 2D array of the adjusted p-values of shape
+        (num_simulations, p_values.size)
     """
 
     n_sim = p_values_panel.shape[0]
 
-    p_values_bhy = np.ones(n_sim)
+    p_values_bhy = np.empty((n_sim, p_values.size))
 
-    for i in range(0, n_sim):
-        simulated_p_values = np.sort(p_values_panel[i])
+    for i in prange(n_sim):
+        simulated_p_values = p_values_panel[i]
 
-        # add the p-value of the examined strategy,
-        # preserving sorting
-        p_val_insert_idx = np.searchsorted(simulated_p_values, p_value)
-        p_values = np.insert(simulated_p_values, p_val_insert_idx, p_value)
+        # adjusted p-values of the simulated ones,
+        # which do not depend on the examined p-value
+        adjusted_p_values = bhy_adjustment_with_insertion(
+            simulated_p_values, multipliers
+        )
 
-        # get the adjusted p-values of the examined strategy
-        p_bhy: np.float64 = bhy_adjustment(p_values)[p_val_insert_idx]
+        for j in range(p_values.size):
+            p_value = p_values[j]
 
-        p_values_bhy[i] = p_bhy
+            # the position at which the p-value of the
+            # examined strategy would be inserted,
+            # preserving sorting
+            p_val_insert_idx = np.searchsorted(simulated_p_values, p_value)
 
-    p_value_bhy = np.median(p_values_bhy)
+            # for the last element,
+            # the value is simply the p-value
+            if p_val_insert_idx == simulated_p_values.size:
+                p_values_bhy[i, j] = p_value
+            # otherwise, the value is
+            # the min of the adjusted one,
+            # or the next element
+            else:
+                p_values_bhy[i, j] = min(
+                    p_value * multipliers[p_val_insert_idx],
+                    adjusted_p_values[p_val_insert_idx],
+                )
 
-    return p_value_bhy
+    return p_values_bhy
+
+
+def get_multiple_testing_adjusted_p_values(
+    p_values_panel: np.ndarray, p_values: np.ndarray
+) -> np.ndarray:
+    """
+    Get the multiple testing adjusted p-values
+    of several strategies, sharing the same
+    panel of simulated p-values
+
+    Parameters
+    ----------
+    p_values_panel: np.ndarray
+        The panel of p-values,
+        with each row sorted in ascending order
+    p_values: np.ndarray
+        The p-values of the strategies
+
+    Returns
+    -------
+    np.ndarray
+        The multiple testing adjusted p-values,
+        as the median over the simulations
+    """
+
+    # the number of tests includes the examined p-value,
+    # and is the same in every simulation
+    multipliers = bhy_multipliers(p_values_panel.shape[1] + 1)
+
+    p_values_bhy = simulate_adjusted_p_values(
+        p_values_panel, np.asarray(p_values, dtype=np.float64), multipliers
+    )
+
+    return np.median(p_values_bhy, axis=0)
 
 
 def hlz_p_value(
-    ann_sr: np.float64,
+    ann_sr: np.ndarray,
     periods: int,
     returns_len: int,
     returns_corr: np.float64,
     num_trials: int,
     num_simulations: int,
-) -> np.float64:
+) -> np.ndarray:
     """
-    Get the multiple testing adjusted p-value,
+    Get the multiple testing adjusted p-values,
     based on the work of Harvey, Liu, and Zhu
 
+    The simulated p-values panel is independent
+    of the Sharpe ratios, so it is generated once
+    and shared between all of the strategies
+
     Parameters
     ----------
-    ann_sr: np.float64
-        The annualized Sharpe ratio
+    ann_sr: np.ndarray
+        The annualized Sharpe ratios of the strategies
     periods : int
         Frequency of the returns,
         e.g. 52 when weekly returns are provided
@@ -322,24 +402,28 @@ def hlz_p_value(
 
     Returns
     -------
-    np.float64
-    The multiple testing adjusted p-value
+    np.ndarray
+    The multiple testing adjusted p-values
     """
 
     num_monthly_observations = np.floor(returns_len * 12 / periods)
     monthly_sr = ann_sr / np.sqrt(12)
-    sr_p_value = sharpe_ratio_p_value(monthly_sr, num_monthly_observations)
+    sr_p_values = sharpe_ratio_p_value(monthly_sr, num_monthly_observations)
 
     simulation_parameters = get_simulation_parameters(returns_corr, num_trials)
 
     t_stats_panel = generate_t_stats_panel(simulation_parameters, num_simulations)
     p_values_panel = t_panel_to_p_panel(t_stats_panel, num_trials)
 
-    mult_test_p_value = get_multiple_testing_adjusted_p_value(
-        p_values_panel, sr_p_value
+    # sort the simulations once, so that each strategy
+    # only has to binary search for its position
+    p_values_panel.sort(axis=1)
+
+    mult_test_p_values = get_multiple_testing_adjusted_p_values(
+        p_values_panel, sr_p_values
     )
 
-    return mult_test_p_value
+    return mult_test_p_values
 
 
 # endregion
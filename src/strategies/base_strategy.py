@@ -36,33 +36,32 @@ class BaseStrategy(bt.Strategy):
         bt.Order.Historical: "Historical",
     }
 
+    # printing the orders and trades of every strategy
+    # slows the backtests down, so it is opt-in
+    verbose: bool = False
+
     def __init__(self):
         self.name = get_strategy_name(self)
         self.returns = bt.analyzers.TimeReturn()
         self.pending_order: Optional[bt.Order] = None
         self.stop_loss_pct = 0.05
+        # price below which the open position is closed
+        self.stop_price: Optional[float] = None
 
     @property
     def close(self):
         return self.data.close[0]
 
     def notify_order(self, order: bt.Order) -> None:
-        status = (
-            self.status_dict[order.status]
-            if order.status in self.status_dict
-            else order.status
-        )
-        exec_type = (
-            self.exec_types_dict[order.exectype]
-            if order.exectype in self.exec_types_dict
-            else order.exectype
-        )
-        order_type = "Buy" if order.isbuy() else "Sell"
-
-        self.log(
-            f"{status} Order: Type {order_type}, "
-            + f"Exec type {exec_type} Size {order.size}, Price {order.price:.5f}"
-        )
+        if self.verbose:
+            status = self.status_dict.get(order.status, order.status)
+            exec_type = self.exec_types_dict.get(order.exectype, order.exectype)
+            order_type = "Buy" if order.isbuy() else "Sell"
+
+            self.log(
+                f"{status} Order: Type {order_type}, "
+                + f"Exec type {exec_type} Size {order.size}, Price {order.price:.5f}"
+            )
 
         if order.status in [
             bt.Order.Submitted,
@@ -77,12 +76,24 @@ class BaseStrategy(bt.Strategy):
         ]:
             self.pending_order = None
 
+        # the stop price only changes when a position is
+        # opened or closed, so it isn't recomputed on every bar
+        if order.status == bt.Order.Completed:
+            self.stop_price = (
+                self.position.price * (1 - self.stop_loss_pct)
+                if self.position
+                else None
+            )
+
     def notify_trade(self, trade: bt.Trade) -> None:
-        if trade.isclosed:
+        if self.verbose and trade.isclosed:
             self.log(
                 f"Trade completed: PnL Gross {trade.pnl:.2f}, "
                 + f"PnL Net {trade.pnlcomm:.2f}"
             )
 
     def log(self, message: str) -> None:
-        print(f"{self.name} {self.datetime.date()} {self.datetime.time()}: {message}")
+        if not self.verbose:
+            return
+
+        print(f"{self.name} {self.datetime.datetime().isoformat(sep=' ')}: {message}")
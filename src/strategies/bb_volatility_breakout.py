@@ -42,6 +42,6 @@ class BBVolatilityBreakoutStrategy(BaseStrategy):
                 self.close < self.bb.lines.bot[0]
                 or
                 # stop loss
-                self.close < self.position.price * (1 - self.stop_loss_pct)
+                self.close < self.stop_price
             ):
                 self.pending_order = self.sell(price=self.close)
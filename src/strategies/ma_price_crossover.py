@@ -24,6 +24,6 @@ class MAPriceCrossoverStrategy(BaseStrategy):
                 self.ma[0] < self.close
                 or
                 # stop loss
-                self.close < self.position.price * (1 - self.stop_loss_pct)
+                self.close < self.stop_price
             ):
                 self.pending_order = self.sell(price=self.close)
@@ -29,6 +29,6 @@ class OscillatorValueStrategy(BaseStrategy):
                 self.indicator[0] > self.params.ob
                 or
                 # stop loss
-                self.close < self.position.price * (1 - self.stop_loss_pct)
+                self.close < self.stop_price
             ):
                 self.pending_order = self.sell(price=self.close)
@@ -26,6 +26,6 @@ class TwoMACrossoverStrategy(BaseStrategy):
                 self.fast_ma[0] < self.slow_ma[0]
                 or
                 # stop loss
-                self.close < self.position.price * (1 - self.stop_loss_pct)
+                self.close < self.stop_price
             ):
                 self.pending_order = self.sell(price=self.close)
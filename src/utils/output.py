@@ -1,7 +1,7 @@
 import inspect
-import os
+import shutil
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Iterator, List, Tuple
 import backtrader as bt
 
 
@@ -12,46 +12,40 @@ def get_strategy_name(strategy: bt.Strategy) -> str:
     """
     strategy_name = strategy.__class__.__name__.replace("Strategy", "")
 
-    def params_to_string(strategy_params: Dict[str, Any]) -> str:
-        def rec(dictionary: Dict[str, Any], acc: str) -> str:
-            result = []
+    def params_to_string(strategy_params: Any) -> str:
+        result: List[str] = []
 
-            for key, value in dictionary.items():
+        # iterators over the nested dictionaries, walked depth-first,
+        # so that nested parameters keep their position
+        stack: List[Iterator[Tuple[str, Any]]] = [
+            iter(strategy_params.__dict__.items())
+        ]
+
+        while stack:
+            for key, value in stack[-1]:
                 if isinstance(value, dict):
-                    result.append(rec(value, acc))
+                    stack.append(iter(value.items()))
+                    break
                 elif inspect.isclass(value):
                     result.append(f"{key}={value.__name__}")
                 else:
                     result.append(f"{key}={value}")
+            else:
+                stack.pop()
 
-            return f'{acc}{",".join(result)}'
-
-        return rec(strategy_params.__dict__, "")
+        return ",".join(result)
 
     string_params = params_to_string(strategy.params)
 
     return f"{strategy_name}({string_params})@{strategy.data._name}"
 
 
-def rm_rec(dir_path: Path):
-    """
-    Remove all files and directories
-    in a given directory
-    """
-
-    for item in os.listdir(dir_path):
-        item_path = os.path.join(dir_path, item)
-
-        if os.path.isfile(item_path):
-            os.remove(item_path)
-        else:
-            os.rmdir(item_path)
-
-
 def ensure_empty_dir(dir_path: Path):
     """
     Ensure that the directory under the specified path
     exists and is empty
     """
+    if dir_path.exists():
+        shutil.rmtree(dir_path)
+
     dir_path.mkdir(parents=True, exist_ok=True)
-    rm_rec(dir_path)